@@ -1,3 +1,7 @@
+import collections
+import json
+import time
+
 from PySide2 import QtWidgets, QtCore, QtGui
 from shiboken2 import wrapInstance
 
@@ -69,8 +73,10 @@ class Window(MayaQWidgetDockableMixin, QtWidgets.QMainWindow):
 class AB_ChannelBox(Window):
 
     attr_change_cb = None
+    dirty_plug_cb = None
+    time_change_cb = None
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, undo_window=0.5):
         super(AB_ChannelBox, self).__init__(parent=parent)
 
         # kill existing script jobs
@@ -81,6 +87,12 @@ class AB_ChannelBox(Window):
         # scriptJob to detect selection changes
         self.sel_changed_sj = cmds.scriptJob(event=["SelectionChanged", self._sel_changed])
 
+        # scriptJobs to follow the undo queue and commit pending edits before other tools work on the scene
+        cmds.scriptJob(event=["Undo", self._on_undo])
+        cmds.scriptJob(event=["Redo", self._on_redo])
+        for event in ["ToolChanged", "DragRelease"]:
+            cmds.scriptJob(event=[event, self._commit_edits])
+
         self._increment = 5
 
         self._validator = QtGui.QRegExpValidator(QtCore.QRegExp("[+-]?([0-9]*[.])?[0-9]+"))
@@ -93,6 +105,15 @@ class AB_ChannelBox(Window):
         self._transforms = dict(translate=["translateX", "translateY", "translateZ"],
                                 rotate=["rotateX", "rotateY", "rotateZ"])
 
+        self._reader = AttrReader(self._current_sel, self._channels)
+
+        # consecutive edits on the same channels within the window are committed as one undo chunk
+        self._journal = OpJournal(window=undo_window)
+        self._commit_timer = QtCore.QTimer(self)
+        self._commit_timer.setSingleShot(True)
+        self._commit_timer.setInterval(int(self._journal.window * 1000))
+        self._commit_timer.timeout.connect(self._commit_edits)
+
         self.setWindowTitle("Channel Box")
         self.adjustSize()
 
@@ -129,10 +150,10 @@ class AB_ChannelBox(Window):
 
         self._interface["checkbox"]["sel_lock"] = QtWidgets.QCheckBox()
         self._interface["checkbox"]["sel_lock"].setStyleSheet("QCheckBox::indicator {height:15; width:15;}"
-                                                              "QCheckBox::indicator:unchecked {image: url("Icons/lock_opened_v2.png)}"
-                                                              "QCheckBox::indicator:unchecked:hover {image: url("Icons/lock_opened_hover_v2.png)}"
-                                                              "QCheckBox::indicator:checked {image: url("Icons/lock_closed_v2.png)}"
-                                                              "QCheckBox::indicator:checked:hover {image: url("Icons/lock_closed_hover_v2.png)}")
+                                                              "QCheckBox::indicator:unchecked {image: url(Icons/lock_opened_v2.png)}"
+                                                              "QCheckBox::indicator:unchecked:hover {image: url(Icons/lock_opened_hover_v2.png)}"
+                                                              "QCheckBox::indicator:checked {image: url(Icons/lock_closed_v2.png)}"
+                                                              "QCheckBox::indicator:checked:hover {image: url(Icons/lock_closed_hover_v2.png)}")
         self._interface["layout"]["header"].addWidget(self._interface["checkbox"]["sel_lock"], 0, 0)
 
         self._interface["button"]["sel"] = QtWidgets.QPushButton("*no selection*")
@@ -189,10 +210,10 @@ class AB_ChannelBox(Window):
 
                 self._interface["checkbox"]["{}_lock".format(attr)] = QtWidgets.QCheckBox()
                 self._interface["checkbox"]["{}_lock".format(attr)].setStyleSheet("QCheckBox::indicator {height:15; width:15;}"
-                                                                                  "QCheckBox::indicator:unchecked {image: url("Icons/lock_opened_v2.png)}"
-                                                                                  "QCheckBox::indicator:unchecked:hover {image: url("Icons/lock_opened_hover_v2.png)}"
-                                                                                  "QCheckBox::indicator:checked {image: url("Icons/lock_closed_v2.png)}"
-                                                                                  "QCheckBox::indicator:checked:hover {image: url("Icons/lock_closed_hover_v2.png)}")
+                                                                                  "QCheckBox::indicator:unchecked {image: url(Icons/lock_opened_v2.png)}"
+                                                                                  "QCheckBox::indicator:unchecked:hover {image: url(Icons/lock_opened_hover_v2.png)}"
+                                                                                  "QCheckBox::indicator:checked {image: url(Icons/lock_closed_v2.png)}"
+                                                                                  "QCheckBox::indicator:checked:hover {image: url(Icons/lock_closed_hover_v2.png)}")
                 self._interface["layout"]["{}_attrs".format(transform)].addWidget(self._interface["checkbox"]["{}_lock".format(attr)], idx, 0)
 
                 self._interface["label"][attr] = QtWidgets.QLabel("{} {}".format(attr[:-1].capitalize(), attr[-1]))
@@ -292,18 +313,18 @@ class AB_ChannelBox(Window):
         self._interface["checkbox"]["rotateZ_lock"].clicked.connect(lambda: self._lock_attr("rotateZ"))
 
         self._interface["input"]["translateX"].editingFinished.connect(
-            lambda: cmds.setAttr("{}.translateX".format(self._current_sel), float(self._interface["input"]["translateX"].text())))
+            lambda: self._set_attr("translateX", float(self._interface["input"]["translateX"].text())))
         self._interface["input"]["translateY"].editingFinished.connect(
-            lambda: cmds.setAttr("{}.translateY".format(self._current_sel), float(self._interface["input"]["translateY"].text())))
+            lambda: self._set_attr("translateY", float(self._interface["input"]["translateY"].text())))
         self._interface["input"]["translateZ"].editingFinished.connect(
-            lambda: cmds.setAttr("{}.translateZ".format(self._current_sel), float(self._interface["input"]["translateZ"].text())))
+            lambda: self._set_attr("translateZ", float(self._interface["input"]["translateZ"].text())))
 
         self._interface["input"]["rotateX"].editingFinished.connect(
-            lambda: cmds.setAttr("{}.rotateX".format(self._current_sel), float(self._interface["input"]["rotateX"].text())))
+            lambda: self._set_attr("rotateX", float(self._interface["input"]["rotateX"].text())))
         self._interface["input"]["rotateY"].editingFinished.connect(
-            lambda: cmds.setAttr("{}.rotateY".format(self._current_sel), float(self._interface["input"]["rotateY"].text())))
+            lambda: self._set_attr("rotateY", float(self._interface["input"]["rotateY"].text())))
         self._interface["input"]["rotateZ"].editingFinished.connect(
-            lambda: cmds.setAttr("{}.rotateZ".format(self._current_sel), float(self._interface["input"]["rotateZ"].text())))
+            lambda: self._set_attr("rotateZ", float(self._interface["input"]["rotateZ"].text())))
 
         self._interface["button"]["translateX_down"].clicked.connect(lambda: self._set_transform("translateX", True, self._increment * -1))
         self._interface["button"]["translateX_up"].clicked.connect(lambda: self._set_transform("translateX", True, self._increment))
@@ -333,6 +354,9 @@ class AB_ChannelBox(Window):
         :return: None
         """
 
+        # pending edits belong to the previous selection state
+        self._commit_edits()
+
         # return if selection is locked
         if self._sel_locked:
             return
@@ -349,12 +373,25 @@ class AB_ChannelBox(Window):
         self._interface["widget"]["translate"].setCurrentIndex(0)
         self._interface["widget"]["rotate"].setCurrentIndex(0)
 
-        # try to remove previous AttributeChangedCallback
+        # try to remove previous AttributeChangedCallback, NodeDirtyPlugCallback and TimeChangeCallback
         try:
             apiOM.MNodeMessage.removeCallback(AB_ChannelBox.attr_change_cb)
             AB_ChannelBox.attr_change_cb = None
         except:
             pass
+        try:
+            apiOM.MNodeMessage.removeCallback(AB_ChannelBox.dirty_plug_cb)
+            AB_ChannelBox.dirty_plug_cb = None
+        except:
+            pass
+        try:
+            apiOM.MDGMessage.removeCallback(AB_ChannelBox.time_change_cb)
+            AB_ChannelBox.time_change_cb = None
+        except:
+            pass
+
+        # drop values read from the previous selection
+        self._reader.reset(self._current_sel)
 
         cmds.menuItem(self._interface["menu"]["show_translate"], edit=True, checkBox=False, enable=False)
         cmds.menuItem(self._interface["menu"]["lock_translate"], edit=True, checkBox=False, enable=False)
@@ -382,13 +419,20 @@ class AB_ChannelBox(Window):
                         self._interface["widget"][i].setCurrentIndex(1)
                         cmds.menuItem(self._interface["menu"]["show_{}".format(i)], edit=True, checkBox=False)
 
+                # only connected channels can change on time changes
+                self._reader.find_connected()
+
                 # update UI attr values
                 for attr in self._channels:
                     self._set_ui_attr(attr)
 
-                # add AttributeChangedCallback to current selection
+                # add AttributeChangedCallback and NodeDirtyPlugCallback to current selection
                 sel_mobject = get_mobject(self._current_sel)
                 AB_ChannelBox.attr_change_cb = apiOM.MNodeMessage.addAttributeChangedCallback(sel_mobject, self._on_attr_change)
+                AB_ChannelBox.dirty_plug_cb = apiOM.MNodeMessage.addNodeDirtyPlugCallback(sel_mobject, self._on_dirty_plug)
+
+                # the Evaluation Manager skips dirty propagation on time changes, animated channels only show up here
+                AB_ChannelBox.time_change_cb = apiOM.MDGMessage.addTimeChangeCallback(self._on_time_change)
 
     def _on_attr_change(self, msg, plug, otherPlug, clientData):
 
@@ -406,6 +450,9 @@ class AB_ChannelBox(Window):
         if "translate" not in plug.name() and "rotate" not in plug.name():
             return
 
+        # cache values carried by the message so the UI update below does not re-read them
+        self._reader.from_message(msg, plug)
+
         plug_name = plug.name()
         # if axis is part of name, remove it - standardized data
         if plug_name[-1] in ["X", "Y", "Z"]:
@@ -426,6 +473,31 @@ class AB_ChannelBox(Window):
             if cmds.getAttr("{}{}".format(plug_name, axis), keyable=True):
                 self._interface["widget"][attr].setCurrentIndex(2)
 
+    def _on_dirty_plug(self, node, plug, clientData):
+
+        """
+        Marks cached channel values as dirty when upstream data changes
+
+        :param node: MObject
+        :param plug: MPlug
+        :param clientData: None
+        :return: None
+        """
+
+        self._reader.mark_dirty(plug)
+
+    def _on_time_change(self, m_time, clientData):
+
+        """
+        Marks cached values of connected channels as dirty when the current time changes
+
+        :param m_time: MTime
+        :param clientData: None
+        :return: None
+        """
+
+        self._reader.invalidate_connected()
+
     def _lock_ui_sel(self, *args):
 
         if self._sel_locked:
@@ -457,15 +529,13 @@ class AB_ChannelBox(Window):
             obj = True
 
         values = cmds.xform(self._current_sel, query=True, worldSpace=not obj, objectSpace=obj, translation=tra, rotation=not tra)
+        before = list(values)
 
         for idx, axis in enumerate(["X", "Y", "Z"]):
             if axis in attr:
                 values[idx] = values[idx] + increment
 
-        if "translate" in attr:
-            cmds.xform(self._current_sel, worldSpace=not obj, objectSpace=obj, translation=values)
-        else:
-            cmds.xform(self._current_sel, worldSpace=not obj, objectSpace=obj, rotation=values)
+        self._apply_edit(attr[:-1], [attr], before, values, space="object" if obj else "world")
 
     def _reset_attr(self, *args):
 
@@ -473,32 +543,68 @@ class AB_ChannelBox(Window):
             cmds.error("Object is not valid for reset")
             return
 
-        for attr in self._channels:
-            if not cmds.getAttr("{}.{}".format(self._current_sel, attr), lock=True):
-                self._interface["input"][attr].setText("0")
-                cmds.setAttr("{}.{}".format(self._current_sel, attr), 0)
+        attrs = [_ for _ in self._channels if not cmds.getAttr("{}.{}".format(self._current_sel, _), lock=True)]
+        if not attrs:
+            return
+
+        before = [self._reader.value(_) for _ in attrs]
+        for attr in attrs:
+            self._interface["input"][attr].setText("0")
+
+        self._apply_edit("set", attrs, before, [0] * len(attrs))
+
+    def _set_attr(self, attr, value):
+
+        """
+        Sets object attribute to a typed value
+
+        :param attr: string
+        :param value: float
+        :return: None
+        """
+
+        self._apply_edit("set", [attr], [self._reader.value(attr)], [value])
 
     def _lock_all(self, transform, lock):
 
-        for attr in self._transforms[transform]:
+        attrs = self._transforms[transform]
+        before = [cmds.getAttr("{}.{}".format(self._current_sel, _), lock=True) for _ in attrs]
+
+        for attr in attrs:
             self._interface["checkbox"]["{}_lock".format(attr)].setChecked(lock)
-            self._lock_attr(attr)
+
+        self._apply_edit("lock", attrs, before, [lock] * len(attrs))
+        self._update_lock_menu(transform, lock)
 
     def _lock_attr(self, attr):
 
         """
         Locks or unlocks object attributes, depending on current state
 
+        :param attr: string
         :return: None
         """
 
-        if self._interface["checkbox"]["{}_lock".format(attr)].isChecked():
-            cmds.setAttr("{}.{}".format(self._current_sel, attr), lock=True)
-            cmds.menuItem(self._interface["menu"]["lock_{}".format(attr[:-1])], edit=True, checkBox=True)
-        else:
-            cmds.setAttr("{}.{}".format(self._current_sel, attr), lock=False)
-            if self._transforms_unlocked(attr[:-1]):
-                cmds.menuItem(self._interface["menu"]["lock_{}".format(attr[:-1])], edit=True, checkBox=False)
+        lock = self._interface["checkbox"]["{}_lock".format(attr)].isChecked()
+        before = [cmds.getAttr("{}.{}".format(self._current_sel, attr), lock=True)]
+
+        self._apply_edit("lock", [attr], before, [lock])
+        self._update_lock_menu(attr[:-1], lock)
+
+    def _update_lock_menu(self, transform, lock):
+
+        """
+        Checks the lock menu item if transform got locked, unchecks it once all axes are unlocked
+
+        :param transform: string
+        :param lock: bool
+        :return: None
+        """
+
+        if lock:
+            cmds.menuItem(self._interface["menu"]["lock_{}".format(transform)], edit=True, checkBox=True)
+        elif self._transforms_unlocked(transform):
+            cmds.menuItem(self._interface["menu"]["lock_{}".format(transform)], edit=True, checkBox=False)
 
     def _show_attrs(self, transform):
 
@@ -508,19 +614,80 @@ class AB_ChannelBox(Window):
         :return: None
         """
 
+        attrs = self._transforms[transform]
         if self._interface["widget"][transform].currentIndex() == 1:
-            print("1")
             cmds.menuItem(self._interface["menu"]["show_{}".format(transform)], edit=True, checkBox=True)
             cmds.menuItem(self._interface["menu"]["lock_{}".format(transform)], edit=True, checkBox=False)
-            cmds.setAttr("{}.{}X".format(self._current_sel, transform), keyable=True, lock=False)
-            cmds.setAttr("{}.{}Y".format(self._current_sel, transform), keyable=True, lock=False)
-            cmds.setAttr("{}.{}Z".format(self._current_sel, transform), keyable=True, lock=False)
+            self._apply_edit("show", attrs, self._flag_states(attrs), [[True, False]] * len(attrs))
         elif self._interface["widget"][transform].currentIndex() == 2:
             cmds.menuItem(self._interface["menu"]["show_{}".format(transform)], edit=True, checkBox=False)
             cmds.menuItem(self._interface["menu"]["lock_{}".format(transform)], edit=True, checkBox=True)
-            cmds.setAttr("{}.{}X".format(self._current_sel, transform), keyable=False, lock=True)
-            cmds.setAttr("{}.{}Y".format(self._current_sel, transform), keyable=False, lock=True)
-            cmds.setAttr("{}.{}Z".format(self._current_sel, transform), keyable=False, lock=True)
+            self._apply_edit("show", attrs, self._flag_states(attrs), [[False, True]] * len(attrs))
+
+    def _flag_states(self, attrs):
+
+        """
+        Returns keyable and lock state pairs of attributes
+
+        :param attrs: list
+        :return: list
+        """
+
+        return [[cmds.getAttr("{}.{}".format(self._current_sel, _), keyable=True),
+                 cmds.getAttr("{}.{}".format(self._current_sel, _), lock=True)] for _ in attrs]
+
+    def _apply_edit(self, op, attrs, before, after, space=None):
+
+        """
+        Applies an edit on the current selection through the journal, it is
+        committed to the undo queue once no further edit on the same channels
+        arrives within the window
+
+        :param op: string
+        :param attrs: list
+        :param before: list
+        :param after: list
+        :param space: string - "object" or "world" for transform edits
+        :return: None
+        """
+
+        self._journal.apply(self._current_sel, op, attrs, before, after, space=space)
+        self._commit_timer.start()
+
+    def _commit_edits(self):
+
+        """
+        Commits pending edits to the undo queue
+
+        :return: None
+        """
+
+        self._commit_timer.stop()
+        self._journal.commit()
+
+    def _on_undo(self):
+
+        """
+        Steps the journal back if Maya undid one of its chunks
+
+        :return: None
+        """
+
+        if OpJournal.is_edit_chunk(cmds.undoInfo(query=True, redoName=True)):
+            self._journal.undo()
+        self._commit_edits()
+
+    def _on_redo(self):
+
+        """
+        Steps the journal forward if Maya redid one of its chunks
+
+        :return: None
+        """
+
+        if OpJournal.is_edit_chunk(cmds.undoInfo(query=True, undoName=True)):
+            self._journal.redo()
+        self._commit_edits()
 
     def _transform_hidden(self, transform):
 
@@ -597,7 +764,7 @@ class AB_ChannelBox(Window):
 
         # updates UI attribute value with current obj value
         self._interface["input"][attr].setText(
-            str((round(cmds.getAttr("{}.{}".format(self._current_sel, attr)), 3) or 0)))
+            str((round(self._reader.value(attr), 3) or 0)))
 
         # locks attribute if conditions apply
         self._lock_ui_attr(attr, lock=False)
@@ -681,6 +848,375 @@ def get_mobject(obj):
     return m_object
 
 
+class AttrReader(object):
+
+    """
+    Reads channel values of a single node while avoiding DG evaluation.
+    Values carried by attribute change messages are cached and reused until
+    the node reports the channel dirty, or the time changes on a channel with
+    an incoming connection, only then a full getAttr is done.
+
+    """
+
+    def __init__(self, node, channels):
+        self.node = node
+        self.channels = channels
+
+        self._values = dict()
+        self._dirty = set(channels)
+        self._connected = set()
+
+        # read counts per strategy, used to measure evaluation cost
+        self.stats = dict(cached=0, message=0, full=0)
+
+    def reset(self, node):
+
+        """
+        Points the reader at a new node and drops all cached values
+
+        :param node: string
+        :return: None
+        """
+
+        self.node = node
+        self._values = dict()
+        self._connected = set()
+        self.invalidate()
+
+    def invalidate(self):
+
+        """
+        Flags all channels as dirty
+
+        :return: None
+        """
+
+        self._dirty = set(self.channels)
+
+    def find_connected(self):
+
+        """
+        Caches which channels of the node have an incoming connection
+
+        :return: None
+        """
+
+        self._connected = set(_ for _ in self.channels
+                              if cmds.connectionInfo("{}.{}".format(self.node, _), isDestination=True))
+
+    def invalidate_connected(self):
+
+        """
+        Flags channels with an incoming connection as dirty
+
+        :return: None
+        """
+
+        self._dirty.update(self._connected)
+
+    def value(self, attr):
+
+        """
+        Returns channel value in UI units, from cache if it is clean
+
+        :param attr: string
+        :return: float
+        """
+
+        if attr not in self._dirty and attr in self._values:
+            self.stats["cached"] += 1
+            return self._values[attr]
+
+        self.stats["full"] += 1
+        self._values[attr] = cmds.getAttr("{}.{}".format(self.node, attr))
+        self._dirty.discard(attr)
+
+        return self._values[attr]
+
+    def from_message(self, msg, plug):
+
+        """
+        Caches the values set on plug, or on its children if compound
+
+        :param msg: integer
+        :param plug: MPlug
+        :return: list - channels that were updated
+        """
+
+        if not msg & apiOM.MNodeMessage.kAttributeSet:
+            return []
+
+        plugs = [plug]
+        if plug.isCompound():
+            plugs = [plug.child(idx) for idx in range(plug.numChildren())]
+
+        updated = []
+        for child in plugs:
+            attr = child.name().split(".")[-1]
+            if attr not in self.channels:
+                continue
+
+            # a plug that was just set is clean, reading it does not pull upstream
+            if attr.startswith("rotate"):
+                self._values[attr] = child.asMAngle().asUnits(apiOM.MAngle.uiUnit())
+            else:
+                self._values[attr] = child.asMDistance().asUnits(apiOM.MDistance.uiUnit())
+            self._dirty.discard(attr)
+            self.stats["message"] += 1
+            updated.append(attr)
+
+        return updated
+
+    def mark_dirty(self, plug):
+
+        """
+        Flags channels of plug, or all channels of a compound plug, as dirty
+
+        :param plug: MPlug
+        :return: None
+        """
+
+        attr = plug.name().split(".")[-1]
+        for channel in self.channels:
+            if channel.startswith(attr):
+                self._dirty.add(channel)
+
+
+class OpJournal(object):
+
+    """
+    Applies channel box edits and records them as compact delta records.
+    Consecutive edits on the same channels within the window are applied
+    with undo suspended and merged into one pending record. On commit the
+    pending record is reset to its before values, still without undo, and
+    its after values are applied once inside a single undo chunk, so no
+    chunk stays open between Qt events. A window of 0 commits every edit
+    right away.
+
+    Memory is bounded by record count, only the latest max_records records
+    are kept. Records past the cursor have been undone in Maya, they are
+    dropped by the next commit.
+
+    An Undo pressed while edits are pending acts on the entry before them,
+    the pending edits are committed right after it.
+
+    """
+
+    chunk_prefix = "AB_ChannelBox_"
+
+    def __init__(self, window=0.5, max_records=500):
+        self.window = window
+        self.records = collections.deque(maxlen=max_records)
+        self.cursor = 0
+
+        self._pending = None
+
+    @classmethod
+    def is_edit_chunk(cls, name):
+
+        """
+        Returns whether an undo queue entry is a chunk committed by a journal
+
+        :param name: string
+        :return: bool
+        """
+
+        return bool(name) and name.startswith(cls.chunk_prefix) and name != "{}replay".format(cls.chunk_prefix)
+
+    def apply(self, node, op, attrs, before, after, space=None):
+
+        """
+        Applies an edit and journals it once it succeeded. Merges it into the
+        pending record if that touched the same channels within the window.
+
+        :param node: string
+        :param op: string - "translate", "rotate", "set", "lock" or "show"
+        :param attrs: list
+        :param before: list - values prior to the edit
+        :param after: list - values after the edit
+        :param space: string - "object" or "world" for transform edits
+        :return: bool - True if the edit was merged into the pending record
+        """
+
+        record = dict(time=time.time(), node=node, op=op, attrs=list(attrs),
+                      before=list(before), after=list(after), space=space, count=1)
+        key = (node, op, list(attrs), space)
+
+        pending = self._pending
+        merge = (pending is not None and self.window > 0
+                 and (pending["node"], pending["op"], pending["attrs"], pending["space"]) == key
+                 and record["time"] - pending["time"] <= self.window)
+        if not merge:
+            self.commit()
+
+        if self.window <= 0:
+            self._commit_record(record)
+            return False
+
+        _apply_without_undo(record, record["after"])
+
+        if merge:
+            pending["after"] = record["after"]
+            pending["time"] = record["time"]
+            pending["count"] += 1
+            return True
+
+        self._pending = record
+        return False
+
+    def commit(self):
+
+        """
+        Commits the pending record to the undo queue, if any
+
+        :return: None
+        """
+
+        if self._pending is None:
+            return
+
+        record, self._pending = self._pending, None
+        _apply_without_undo(record, record["before"])
+        self._commit_record(record)
+
+    def _commit_record(self, record):
+        cmds.undoInfo(openChunk=True, chunkName="{}{}".format(self.chunk_prefix, record["op"]))
+        try:
+            _apply_record(record, record["after"])
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        # a new edit drops the undone ones, like Maya drops its redo queue
+        while len(self.records) > self.cursor:
+            self.records.pop()
+        self.records.append(record)
+        self.cursor = len(self.records)
+
+    def undo(self):
+
+        """
+        Steps the cursor back over a record undone in Maya
+
+        :return: None
+        """
+
+        self.cursor = max(self.cursor - 1, 0)
+
+    def redo(self):
+
+        """
+        Steps the cursor forward over a record redone in Maya
+
+        :return: None
+        """
+
+        self.cursor = min(self.cursor + 1, len(self.records))
+
+    def live_records(self):
+
+        """
+        Returns the records that are not undone
+
+        :return: list
+        """
+
+        return list(self.records)[:self.cursor]
+
+    def replay(self, records=None):
+
+        """
+        Re-applies the after values of records as a single undo chunk
+
+        :param records: list - defaults to the records of the session that are not undone
+        :return: None
+        """
+
+        self.commit()
+        if records is None:
+            records = self.live_records()
+
+        cmds.undoInfo(openChunk=True, chunkName="{}replay".format(self.chunk_prefix))
+        try:
+            for record in records:
+                _apply_record(record, record["after"])
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    def export(self, path):
+
+        """
+        Writes the records that are not undone to a json file
+
+        :param path: string
+        :return: None
+        """
+
+        self.commit()
+        with open(path, "w") as f:
+            json.dump(self.live_records(), f, indent=4)
+
+    @staticmethod
+    def load(path):
+
+        """
+        Reads records exported by export, to be passed to replay
+
+        :param path: string
+        :return: list
+        """
+
+        with open(path) as f:
+            return json.load(f)
+
+
+def _apply_record(record, values):
+
+    """
+    Applies values of a journal record to its node
+
+    :param record: dict
+    :param values: list
+    :return: None
+    """
+
+    node = record["node"]
+    if record["op"] in ["translate", "rotate"]:
+        obj = record["space"] == "object"
+        if record["op"] == "translate":
+            cmds.xform(node, worldSpace=not obj, objectSpace=obj, translation=values)
+        else:
+            cmds.xform(node, worldSpace=not obj, objectSpace=obj, rotation=values)
+        return
+
+    for attr, value in zip(record["attrs"], values):
+        if record["op"] == "set":
+            cmds.setAttr("{}.{}".format(node, attr), value)
+        elif record["op"] == "lock":
+            cmds.setAttr("{}.{}".format(node, attr), lock=value)
+        elif record["op"] == "show":
+            cmds.setAttr("{}.{}".format(node, attr), keyable=value[0], lock=value[1])
+
+
+def _apply_without_undo(record, values):
+
+    """
+    Applies values of a journal record to its node without adding to the undo queue
+
+    :param record: dict
+    :param values: list
+    :return: None
+    """
+
+    state = cmds.undoInfo(query=True, state=True)
+    if state:
+        cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        _apply_record(record, values)
+    finally:
+        if state:
+            cmds.undoInfo(stateWithoutFlush=True)
+
+
 def _select_obj(obj):
     if cmds.objExists(obj):
         cmds.select(obj)
@@ -696,7 +1232,21 @@ def clean_up():
     for i in existing_sj:
         cmds.scriptJob(kill=int(i.split(":")[0]))
 
+    # commit pending edits to the undo queue
+    if AB_ChannelBox._instance:
+        AB_ChannelBox._instance._commit_edits()
+
     try:
         apiOM.MNodeMessage.removeCallback(AB_ChannelBox.attr_change_cb)
     except:
         pass
+
+    try:
+        apiOM.MNodeMessage.removeCallback(AB_ChannelBox.dirty_plug_cb)
+    except:
+        pass
+
+    try:
+        apiOM.MDGMessage.removeCallback(AB_ChannelBox.time_change_cb)
+    except:
+        pass
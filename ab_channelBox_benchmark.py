@@ -0,0 +1,905 @@
+"""
+Benchmarks the AB_ChannelBox edit pipeline outside of Maya.
+
+Maya and Qt are replaced by a local stand-in that records every command call
+together with a simulated cost. The write paths _set_transform, _reset_attr,
+_lock_all and _show_attrs, and the AttrReader read path behind the UI fields,
+are run for a growing number of nodes and compared against the stored baseline.
+
+The channel box is built through its own __init__ and each node is selected
+through _sel_changed, only the edit that follows is measured. Every call has a
+fixed simulated cost, so flat scenes scale linearly by design. World space
+calls cost more the deeper a node sits in the hierarchy, the hierarchy
+scenario shows how that grows with the node count.
+
+Behavior checks of AttrReader and OpJournal run first, against the same stand-in.
+
+Run with a standalone interpreter, not from inside Maya:
+
+    python ab_channelBox_benchmark.py
+    python ab_channelBox_benchmark.py --update-baseline
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ab_channelBox_benchmark.json")
+
+NODE_COUNTS = [1, 100, 1000, 10000]
+
+# results that must not exceed the baseline
+COMPARED = ["simulated_us", "undo_entries", "calls", "full_reads"]
+
+# simulated cost of a single command call in microseconds
+COSTS = dict(
+    getAttr=5,
+    getAttr_flag=2,
+    setAttr=20,
+    setAttr_flag=10,
+    xform_query_object=15,
+    xform_query_world=25,
+    xform_object=40,
+    xform_world=60,
+    xform_parent=5,
+    ls=2,
+    connectionInfo=2,
+    scriptJob=0,
+    popupMenu=0,
+    objectType=2,
+    menuItem=3,
+    plug=1,
+    undoInfo=1,
+    error=0,
+)
+
+
+class MayaStandIn(object):
+
+    """
+    Stands in for maya.cmds. Keeps a flat scene of transform channels, logs
+    every call with its simulated cost and keeps the undo queue the calls
+    would create. Undo and redo only move queue entries, the scene is kept.
+
+    """
+
+    channels = ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ"]
+
+    def __init__(self):
+        self.scene = dict()
+        self.parents = dict()
+        self.selection = []
+        self.reset_counters()
+
+    def reset_counters(self):
+
+        """
+        Clears call log and counters, keeps the scene
+
+        :return: None
+        """
+
+        self.calls = []
+        self.cost = 0
+        self.writes = 0
+        self.undo_entries = 0
+        self.undo_queue = []
+        self.redo_queue = []
+
+        self._undo_state = True
+        self._chunk_depth = 0
+        self._chunk_name = None
+        self._chunk_dirty = False
+
+    def add_node(self, node, locked=False, hidden=False, parent=None, connected=False):
+
+        """
+        Adds a transform with all channels at 0
+
+        :param node: string
+        :param locked: bool
+        :param hidden: bool - hidden channels are non keyable and locked
+        :param parent: string
+        :param connected: bool - translate channels have an incoming connection
+        :return: None
+        """
+
+        self.parents[node] = parent
+        self.scene[node] = dict()
+        for attr in self.channels:
+            self.scene[node][attr] = dict(value=0.0, lock=locked or hidden, keyable=not hidden,
+                                          connected=connected and attr.startswith("translate"))
+
+    def _log(self, cmd, key, writes=0):
+        self.calls.append(cmd)
+        self.cost += COSTS[key]
+
+        if not writes:
+            return
+
+        self.writes += writes
+        if not self._undo_state:
+            return
+        if self._chunk_depth:
+            self._chunk_dirty = True
+        else:
+            self._add_undo(cmd)
+
+    def _add_undo(self, name):
+        self.undo_entries += 1
+        self.undo_queue.append(name)
+        self.redo_queue = []
+
+    def undo(self):
+        if self.undo_queue:
+            self.redo_queue.append(self.undo_queue.pop())
+
+    def redo(self):
+        if self.redo_queue:
+            self.undo_queue.append(self.redo_queue.pop())
+
+    def _depth(self, node):
+        depth = 0
+        while self.parents.get(node):
+            node = self.parents[node]
+            depth += 1
+        return depth
+
+    def _channel(self, plug):
+        node, attr = plug.split(".")
+        return self.scene[node][attr]
+
+    def getAttr(self, plug, lock=False, keyable=False):
+        if lock or keyable:
+            self._log("getAttr", "getAttr_flag")
+            return self._channel(plug)["lock" if lock else "keyable"]
+
+        self._log("getAttr", "getAttr")
+        return self._channel(plug)["value"]
+
+    def setAttr(self, plug, *args, **kwargs):
+        channel = self._channel(plug)
+
+        if args:
+            self._log("setAttr", "setAttr", writes=1)
+            channel["value"] = float(args[0])
+            return
+
+        self._log("setAttr", "setAttr_flag", writes=1)
+        for flag in ["lock", "keyable"]:
+            if flag in kwargs:
+                channel[flag] = bool(kwargs[flag])
+
+    def xform(self, node, query=False, worldSpace=False, objectSpace=False, translation=None, rotation=None):
+        space = "world" if worldSpace else "object"
+        attr = "translate" if translation not in [None, False] else "rotate"
+
+        # world space has to walk the parents, values are kept in object space
+        if worldSpace:
+            for idx in range(self._depth(node)):
+                self._log("xform", "xform_parent")
+
+        if query:
+            self._log("xform", "xform_query_{}".format(space))
+            return [self.scene[node]["{}{}".format(attr, axis)]["value"] for axis in ["X", "Y", "Z"]]
+
+        values = translation if attr == "translate" else rotation
+        self._log("xform", "xform_{}".format(space), writes=3)
+        for axis, value in zip(["X", "Y", "Z"], values):
+            self.scene[node]["{}{}".format(attr, axis)]["value"] = float(value)
+
+    def undoInfo(self, query=False, state=False, undoName=False, redoName=False, stateWithoutFlush=None,
+                 openChunk=False, closeChunk=False, chunkName=None):
+        self._log("undoInfo", "undoInfo")
+
+        if query:
+            if state:
+                return self._undo_state
+            queue = self.undo_queue if undoName else self.redo_queue
+            return queue[-1] if queue else ""
+
+        if stateWithoutFlush is not None:
+            self._undo_state = bool(stateWithoutFlush)
+        elif openChunk:
+            self._chunk_depth += 1
+            if self._chunk_depth == 1:
+                self._chunk_name = chunkName
+        elif closeChunk and self._chunk_depth:
+            self._chunk_depth -= 1
+            if not self._chunk_depth and self._chunk_dirty:
+                self._add_undo(self._chunk_name)
+                self._chunk_dirty = False
+
+    def connectionInfo(self, plug, isDestination=False):
+        self._log("connectionInfo", "connectionInfo")
+        return self._channel(plug)["connected"]
+
+    def objectType(self, node):
+        self._log("objectType", "objectType")
+        return "transform"
+
+    def menuItem(self, *args, **kwargs):
+        self._log("menuItem", "menuItem")
+        return False if kwargs.get("query") else "menuItem"
+
+    def popupMenu(self, *args, **kwargs):
+        self._log("popupMenu", "popupMenu")
+        return "popupMenu"
+
+    def scriptJob(self, listJobs=False, **kwargs):
+        self._log("scriptJob", "scriptJob")
+        return [] if listJobs else 0
+
+    def ls(self, sl=False):
+        self._log("ls", "ls")
+        return list(self.selection)
+
+    def error(self, msg):
+        self._log("error", "error")
+        raise RuntimeError(msg)
+
+
+class _Qt(object):
+
+    """
+    Stands in for Qt classes and widgets. Keeps the text, check state and
+    stack index AB_ChannelBox reads back, anything else is a no-op.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._text = ([_ for _ in args if isinstance(_, str)] or [""])[0]
+        self._checked = False
+        self._index = 0
+
+    def __call__(self, *args, **kwargs):
+        return _Qt(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Qt()
+
+    def __or__(self, other):
+        return self
+
+    def text(self):
+        return self._text
+
+    def setText(self, text):
+        self._text = text
+
+    def isChecked(self):
+        return self._checked
+
+    def setChecked(self, checked):
+        self._checked = checked
+
+    def currentIndex(self):
+        return self._index
+
+    def setCurrentIndex(self, index):
+        self._index = index
+
+
+class _QtModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Qt()
+
+
+class _MDistance(object):
+
+    """
+    Stands in for MDistance and MAngle, the stand-in scene stores UI units
+
+    """
+
+    def __init__(self, value):
+        self._value = value
+
+    def asUnits(self, unit):
+        return self._value
+
+    @staticmethod
+    def uiUnit():
+        return None
+
+
+class _MNodeMessage(object):
+
+    kAttributeSet = 1 << 3
+
+    @staticmethod
+    def addAttributeChangedCallback(m_object, func):
+        return 1
+
+    @staticmethod
+    def addNodeDirtyPlugCallback(m_object, func):
+        return 2
+
+    @staticmethod
+    def removeCallback(callback_id):
+        pass
+
+
+class _MDGMessage(object):
+
+    @staticmethod
+    def addTimeChangeCallback(func):
+        return 3
+
+    @staticmethod
+    def removeCallback(callback_id):
+        pass
+
+
+class _MSelectionList(object):
+
+    def add(self, obj):
+        self._obj = obj
+
+    def getDependNode(self, idx, m_object):
+        m_object.name = self._obj
+
+
+class _MObject(object):
+
+    name = None
+
+
+class _MPlug(object):
+
+    """
+    Stands in for the MPlug passed with node messages, reading it is logged as a plug call
+
+    """
+
+    def __init__(self, cmds, name):
+        self._cmds = cmds
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def isCompound(self):
+        return self._name[-1] not in ["X", "Y", "Z"]
+
+    def numChildren(self):
+        return 3 if self.isCompound() else 0
+
+    def child(self, idx):
+        return _MPlug(self._cmds, "{}{}".format(self._name, ["X", "Y", "Z"][idx]))
+
+    def asMDistance(self):
+        self._cmds._log("plug", "plug")
+        return _MDistance(self._cmds._channel(self._name)["value"])
+
+    asMAngle = asMDistance
+
+
+def _install_stand_in(cmds):
+
+    """
+    Registers stand-in Maya and Qt modules so ab_channelBox can be imported
+
+    :param cmds: MayaStandIn
+    :return: None
+    """
+
+    def module(name, module_type=types.ModuleType, **attrs):
+        mod = module_type(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    qt_widgets = module("PySide2.QtWidgets", _QtModule, QMainWindow=_Qt)
+    qt_core = module("PySide2.QtCore", _QtModule)
+    qt_gui = module("PySide2.QtGui", _QtModule)
+    module("PySide2", QtWidgets=qt_widgets, QtCore=qt_core, QtGui=qt_gui)
+    module("shiboken2", wrapInstance=None)
+
+    sys.modules["maya.cmds"] = cmds
+    om = module("maya.OpenMaya", MNodeMessage=_MNodeMessage, MDGMessage=_MDGMessage, MSelectionList=_MSelectionList,
+                MObject=_MObject, MDistance=_MDistance, MAngle=_MDistance)
+    omui = module("maya.OpenMayaUI")
+    mixin = module("maya.app.general.mayaMixin",
+                   MayaQWidgetDockableMixin=type("MayaQWidgetDockableMixin", (object,), {}))
+    general = module("maya.app.general", mayaMixin=mixin)
+    app = module("maya.app", general=general)
+    module("maya", cmds=cmds, OpenMaya=om, OpenMayaUI=omui, app=app)
+
+
+def _load_tool(cmds):
+
+    """
+    Imports ab_channelBox against the stand-in
+
+    :param cmds: MayaStandIn
+    :return: module
+    """
+
+    _install_stand_in(cmds)
+    import ab_channelBox as ab
+
+    # the module is cached after the first import, point it at this stand-in
+    ab.cmds = cmds
+
+    return ab
+
+
+def _make_box(ab, cmds, node):
+
+    """
+    Returns an AB_ChannelBox built through its own __init__, with node selected
+
+    :param ab: module - ab_channelBox
+    :param cmds: MayaStandIn
+    :param node: string
+    :return: AB_ChannelBox
+    """
+
+    cmds.selection = [node]
+    return ab.AB_ChannelBox()
+
+
+def _nudge(box):
+    box._set_transform("translateX", True, box._increment)
+    box._set_transform("rotateY", False, box._increment)
+
+
+def _nudge_repeat(box):
+    # ten clicks on the same channel within the undo window, committed as one chunk
+    for idx in range(10):
+        box._set_transform("translateX", True, box._increment)
+
+
+def _read(box):
+    # what Maya sends the channel box while the user works on one node
+    cmds = sys.modules["maya.cmds"]
+    node = box._current_sel
+
+    # an edit is followed by its change message
+    box._set_transform("translateX", True, box._increment)
+    box._on_attr_change(_MNodeMessage.kAttributeSet, _MPlug(cmds, "{}.translate".format(node)), None, None)
+
+    # upstream change on rotate, then a time change
+    box._on_dirty_plug(None, _MPlug(cmds, "{}.rotate".format(node)), None)
+    for attr in box._transforms["rotate"]:
+        box._set_ui_attr(attr)
+    box._on_time_change(None, None)
+    for attr in box._channels:
+        box._set_ui_attr(attr)
+
+
+def _reset(box):
+    box._reset_attr()
+
+
+def _lock(box):
+    lock = not box._interface["checkbox"]["translateX_lock"].isChecked()
+    box._lock_all("translate", lock)
+    box._lock_all("rotate", lock)
+
+
+def _show(box):
+    box._show_attrs("translate")
+    box._show_attrs("rotate")
+
+
+# name, edit, space, locked, hidden, hierarchy, connected
+SCENARIOS = [
+    ("nudge_object", _nudge, "Object", False, False, False, False),
+    ("nudge_world", _nudge, "World", False, False, False, False),
+    ("nudge_world_hierarchy", _nudge, "World", False, False, True, False),
+    ("nudge_coalesced", _nudge_repeat, "Object", False, False, False, False),
+    ("reset_unlocked", _reset, "Object", False, False, False, False),
+    ("reset_locked", _reset, "Object", True, False, False, False),
+    ("lock_all_unlocked", _lock, "Object", False, False, False, False),
+    ("lock_all_locked", _lock, "Object", True, False, False, False),
+    ("show_attrs_hidden", _show, "Object", False, True, False, False),
+    ("show_attrs_visible", _show, "Object", False, False, False, False),
+    ("read_ui", _read, "Object", False, False, False, False),
+    ("read_ui_connected", _read, "Object", False, False, False, True),
+]
+
+
+def _counters(cmds, box):
+    return dict(calls=len(cmds.calls), simulated_us=cmds.cost, writes=cmds.writes, undo_entries=cmds.undo_entries,
+                full_reads=box._reader.stats["full"], message_reads=box._reader.stats["message"],
+                cached_reads=box._reader.stats["cached"])
+
+
+def run_scenario(ab, cmds, edit, count, space="Object", locked=False, hidden=False, hierarchy=False,
+                 connected=False):
+
+    """
+    Selects each of count nodes through the channel box and runs an edit on
+    it. Only the edit and the commit of its undo chunk are measured.
+
+    :param ab: module - ab_channelBox
+    :param cmds: MayaStandIn
+    :param edit: function - takes the channel box, edits its current selection
+    :param count: integer
+    :param space: string - "Object" or "World"
+    :param locked: bool
+    :param hidden: bool
+    :param hierarchy: bool - nodes form a balanced binary tree instead of a flat scene
+    :param connected: bool - translate channels have an incoming connection
+    :return: dict
+    """
+
+    cmds.scene = dict()
+    cmds.parents = dict()
+    nodes = ["node{}".format(idx) for idx in range(count)]
+    for idx, node in enumerate(nodes):
+        parent = nodes[(idx - 1) // 2] if hierarchy and idx else None
+        cmds.add_node(node, locked=locked, hidden=hidden, parent=parent, connected=connected)
+
+    box = _make_box(ab, cmds, nodes[0])
+    box._interface["button"]["space"].setText(space)
+    cmds.reset_counters()
+
+    result = dict((key, 0) for key in _counters(cmds, box))
+    wall = 0
+    for node in nodes:
+        cmds.selection = [node]
+        box._sel_changed()
+
+        start = time.time()
+        before = _counters(cmds, box)
+        edit(box)
+        box._commit_edits()
+        after = _counters(cmds, box)
+        wall += time.time() - start
+
+        for key in result:
+            result[key] += after[key] - before[key]
+
+    result.update(nodes=count,
+                  writes_per_sec=result["writes"] / (result["simulated_us"] / 1e6) if result["simulated_us"] else 0.0,
+                  wall_ms=wall * 1000)
+    return result
+
+
+def run(counts=None):
+
+    """
+    Runs all scenarios for each node count
+
+    :param counts: list - defaults to NODE_COUNTS
+    :return: dict - scenario name to list of results
+    """
+
+    cmds = MayaStandIn()
+    ab = _load_tool(cmds)
+
+    results = dict()
+    for name, edit, space, locked, hidden, hierarchy, connected in SCENARIOS:
+        results[name] = [run_scenario(ab, cmds, edit, count, space=space, locked=locked, hidden=hidden,
+                                      hierarchy=hierarchy, connected=connected)
+                         for count in counts or NODE_COUNTS]
+
+    return results
+
+
+def report(results):
+
+    """
+    Prints throughput, undo entries, AttrReader reads by strategy and scaling
+    per scenario.
+    Scale is simulated cost per node relative to the smallest run. It is 1.0
+    by design on flat scenes and grows with depth on the hierarchy. Wall
+    us/node is the measured Python cost per node.
+
+    :param results: dict
+    :return: None
+    """
+
+    row = "{:<24}{:>8}{:>10}{:>8}{:>8}{:>8}{:>8}{:>14}{:>14}{:>12}{:>8}{:>14}"
+    print(row.format("scenario", "nodes", "writes", "undo", "full", "msg", "cached", "simulated ms", "writes/sec",
+                     "wall ms", "scale", "wall us/node"))
+
+    for name, runs in sorted(results.items()):
+        unit = float(runs[0]["simulated_us"]) / runs[0]["nodes"]
+        for result in runs:
+            print(row.format(name, result["nodes"], result["writes"], result["undo_entries"],
+                             result["full_reads"], result["message_reads"], result["cached_reads"],
+                             "{:.2f}".format(result["simulated_us"] / 1000.0),
+                             "{:.0f}".format(result["writes_per_sec"]),
+                             "{:.2f}".format(result["wall_ms"]),
+                             "{:.2f}".format(result["simulated_us"] / (unit * result["nodes"]) if unit else 0.0),
+                             "{:.1f}".format(result["wall_ms"] * 1000 / result["nodes"])))
+
+
+def compare(results, baseline, tolerance):
+
+    """
+    Returns the runs that are more expensive than the baseline, that did not
+    run any command, or that have no baseline entry.
+    Wall time is not compared, it depends on the machine.
+
+    :param results: dict
+    :param baseline: dict
+    :param tolerance: float - allowed increase, 0.1 is 10%
+    :return: list - failure messages
+    """
+
+    failures = []
+    for name in sorted(set(baseline) - set(results)):
+        failures.append("{}: in baseline but not run".format(name))
+
+    for name, runs in sorted(results.items()):
+        if name not in baseline:
+            failures.append("{}: missing from baseline".format(name))
+            continue
+
+        stored = dict((_["nodes"], _) for _ in baseline[name])
+        for result in runs:
+            if result["nodes"] not in stored:
+                failures.append("{} ({} nodes): missing from baseline".format(name, result["nodes"]))
+                continue
+            if not result["calls"] or not result["simulated_us"]:
+                failures.append("{} ({} nodes): no commands recorded".format(name, result["nodes"]))
+                continue
+            for key in COMPARED:
+                if key not in stored[result["nodes"]]:
+                    failures.append("{} ({} nodes): {} missing from baseline".format(name, result["nodes"], key))
+                    continue
+                limit = stored[result["nodes"]][key] * (1 + tolerance)
+                if result[key] > limit:
+                    failures.append("{} ({} nodes): {} {} exceeds baseline {}".format(
+                        name, result["nodes"], key, result[key], stored[result["nodes"]][key]))
+
+    return failures
+
+
+def check_reader():
+
+    """
+    Checks that AttrReader values follow dirty plugs, time changes, change
+    messages and selection changes against the stand-in
+
+    :return: list - failure messages
+    """
+
+    cmds = MayaStandIn()
+    ab = _load_tool(cmds)
+    failures = []
+
+    def check(ok, msg):
+        if not ok:
+            failures.append("reader: {}".format(msg))
+
+    cmds.add_node("node0", connected=True)
+    cmds.add_node("node1")
+    cmds.scene["node1"]["translateX"]["value"] = 7.0
+    box = _make_box(ab, cmds, "node0")
+    reader = box._reader
+
+    # a value changed upstream is read again once its plug is dirty
+    cmds.scene["node0"]["rotateX"]["value"] = 1.0
+    cmds.scene["node0"]["rotateY"]["value"] = 1.0
+    check(reader.value("rotateX") == 0.0, "value was read again without being dirty")
+    box._on_dirty_plug(None, _MPlug(cmds, "node0.rotate"), None)
+    check(reader.value("rotateX") == 1.0, "dirty plug returned the stale value")
+
+    # a time change reads connected channels again, static ones stay cached
+    cmds.scene["node0"]["translateX"]["value"] = 2.0
+    reader.value("rotateY")
+    cmds.scene["node0"]["rotateY"]["value"] = 2.0
+    box._on_time_change(None, None)
+    full = reader.stats["full"]
+    check(reader.value("translateX") == 2.0, "time change returned the stale value of a connected channel")
+    check(reader.stats["full"] == full + 1, "time change did not make the next read a full read")
+    check(reader.value("rotateY") == 1.0 and reader.stats["full"] == full + 1,
+          "time change invalidated a channel without incoming connection")
+
+    # a compound change message caches all three children
+    for axis, value in zip(["X", "Y", "Z"], [3.0, 4.0, 5.0]):
+        cmds.scene["node0"]["translate{}".format(axis)]["value"] = value
+    message, full = reader.stats["message"], reader.stats["full"]
+    box._on_attr_change(_MNodeMessage.kAttributeSet, _MPlug(cmds, "node0.translate"), None, None)
+    check(reader.stats["message"] == message + 3, "compound message did not cache all three children")
+    check([reader.value(_) for _ in box._transforms["translate"]] == [3.0, 4.0, 5.0]
+          and reader.stats["full"] == full, "compound message values were not served from cache")
+
+    # selecting another node drops the cache of the previous one
+    cmds.selection = ["node1"]
+    box._sel_changed()
+    check(reader.value("translateX") == 7.0, "reset kept the cache of the previous node")
+
+    return failures
+
+
+def check_journal():
+
+    """
+    Checks OpJournal merging, eviction, failed edits, following the undo
+    queue and the export, load and replay round trip against the stand-in
+
+    :return: list - failure messages
+    """
+
+    cmds = MayaStandIn()
+    ab = _load_tool(cmds)
+    failures = []
+
+    def check(ok, msg):
+        if not ok:
+            failures.append("journal: {}".format(msg))
+
+    def edit(journal, attrs, before, after, space=None):
+        journal.apply("node0", "set", attrs, before, after, space=space)
+
+    def make_box():
+        return _make_box(ab, cmds, "node0")
+
+    # same channels within the window merge into one record, committed as one undo entry
+    cmds.add_node("node0")
+    journal = ab.OpJournal()
+    edit(journal, ["translateX"], [0], [1])
+    edit(journal, ["translateX"], [1], [2])
+    check(cmds._chunk_depth == 0, "undo chunk left open between edits")
+    check(cmds.undo_entries == 0, "pending edits reached the undo queue")
+    check(cmds.scene["node0"]["translateX"]["value"] == 2, "pending edits were not applied")
+    journal.commit()
+    check(len(journal.records) == 1, "edits within the window were not merged")
+    check(journal.records[-1]["before"] == [0] and journal.records[-1]["after"] == [2],
+          "merged record does not span first before to last after")
+    check(journal.records[-1]["count"] == 2, "merged record count is not 2")
+    check(cmds.undo_queue == ["AB_ChannelBox_set"], "merged edits left undo queue {}".format(cmds.undo_queue))
+    check(cmds._undo_state, "undo was left suspended")
+
+    # other channels, other space or a window of 0 do not merge
+    journal = ab.OpJournal()
+    edit(journal, ["translateX"], [0], [1])
+    edit(journal, ["translateY"], [0], [1])
+    edit(journal, ["translateY"], [0], [1], space="world")
+    journal.commit()
+    check(len(journal.records) == 3, "edits on other channels or space were merged")
+
+    cmds.reset_counters()
+    journal = ab.OpJournal(window=0)
+    edit(journal, ["translateX"], [0], [1])
+    edit(journal, ["translateX"], [1], [2])
+    check(len(journal.records) == 2, "edits were merged with a window of 0")
+    check(cmds.undo_entries == 2, "a window of 0 did not commit every edit")
+
+    # only the latest max_records records are kept
+    journal = ab.OpJournal(max_records=3)
+    for attr in MayaStandIn.channels[:5]:
+        edit(journal, [attr], [0], [1])
+    journal.commit()
+    check([_["attrs"] for _ in journal.records] == [["translateZ"], ["rotateX"], ["rotateY"]],
+          "oldest records were not evicted")
+
+    # an edit that raises leaves no record and undo switched on
+    box = make_box()
+    set_attr = cmds.setAttr
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("channel is connected")
+
+    cmds.setAttr = fail
+    try:
+        box._set_attr("translateX", 5.0)
+    except RuntimeError:
+        pass
+    cmds.setAttr = set_attr
+    box._commit_edits()
+    check(not box._journal.records, "failed edit was journaled")
+    check(cmds._undo_state, "failed edit left undo suspended")
+
+    # records undone in Maya are stepped over and dropped by the next edit
+    cmds.reset_counters()
+    box = make_box()
+    box._set_attr("translateX", 1.0)
+    box._commit_edits()
+    box._set_attr("translateY", 1.0)
+    box._commit_edits()
+    cmds.undo()
+    box._on_undo()
+    check(box._journal.cursor == 1, "undo did not step the cursor back")
+    check([_["attrs"] for _ in box._journal.live_records()] == [["translateX"]], "undone record is still live")
+    cmds.redo()
+    box._on_redo()
+    check(box._journal.cursor == 2, "redo did not step the cursor forward")
+    cmds.undo()
+    box._on_undo()
+    box._set_attr("translateZ", 1.0)
+    box._commit_edits()
+    check([_["attrs"] for _ in box._journal.records] == [["translateX"], ["translateZ"]],
+          "undone record was not dropped by the next edit")
+    cmds.setAttr("node0.rotateX", 1.0)
+    cmds.undo()
+    box._on_undo()
+    check(box._journal.cursor == 2, "undo of another command moved the cursor")
+
+    # export, load and replay re-apply the session as one undo entry
+    cmds.scene = dict()
+    cmds.add_node("node0")
+    cmds.scene["node0"]["rotateX"]["lock"] = True
+    box = make_box()
+    box._set_transform("translateX", True, 2)
+    box._set_attr("translateY", 3.0)
+    box._interface["widget"]["rotate"].setCurrentIndex(2)
+    box._show_attrs("rotate")
+    box._commit_edits()
+    expected = dict((attr, dict(_)) for attr, _ in cmds.scene["node0"].items())
+
+    handle, path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    try:
+        box._journal.export(path)
+        records = ab.OpJournal.load(path)
+    finally:
+        os.remove(path)
+
+    check(len(records) == 3, "export wrote {} records instead of 3".format(len(records)))
+    check(records[-1]["before"][0] == [True, True], "show record lost the lock state of a locked channel")
+
+    # undo the show edit from its record, the locked channel has to stay locked
+    ab._apply_record(records[-1], records[-1]["before"])
+    check(cmds.scene["node0"]["rotateX"]["lock"] and not cmds.scene["node0"]["rotateY"]["lock"],
+          "show record did not restore lock states")
+
+    cmds.scene = dict()
+    cmds.add_node("node0")
+    cmds.reset_counters()
+    ab.OpJournal().replay(records)
+    check(cmds.scene["node0"] == expected, "replay did not reproduce the session")
+    check(cmds.undo_entries == 1, "replay created {} undo entries".format(cmds.undo_entries))
+
+    return failures
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Benchmarks the AB_ChannelBox edit pipeline.")
+    parser.add_argument("--counts", type=int, nargs="+", default=NODE_COUNTS)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    failures = check_reader() + check_journal()
+    for failure in failures:
+        print(failure)
+    if failures:
+        return 1
+
+    results = run(args.counts)
+    report(results)
+
+    if args.update_baseline:
+        stored = dict((name, [dict((key, _[key]) for key in ["nodes", "writes"] + COMPARED)
+                              for _ in runs]) for name, runs in results.items())
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=4, sort_keys=True)
+        print("baseline written to {}".format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline at {}, run with --update-baseline".format(args.baseline))
+        return 1
+
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f), args.tolerance)
+
+    for failure in failures:
+        print(failure)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())